@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Numerical kernels for aggregating gamelog statistics. These are compiled with
+numba when it is installed, and otherwise fall back to vectorized numpy.
+
+@author: David P. Fleming, 2024
+"""
+
+# Imports
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+__all__ = ["expanding_mean_prior"]
+
+
+def __expanding_mean_prior_numpy(values : np.ndarray) -> np.ndarray:
+    """
+    numpy implementation of expanding_mean_prior using cumulative sums
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        array of shape (n_games, n_features) of game stats
+
+    Returns
+    -------
+    means : numpy.ndarray
+        array of shape (n_games + 1, n_features) of prior mean stats
+    """
+
+    nan_mask = np.isnan(values)
+
+    # Cumulative sums, counts of non-NaN values over the first k games
+    sums = np.zeros((values.shape[0] + 1, values.shape[1]))
+    counts = np.zeros((values.shape[0] + 1, values.shape[1]))
+    np.cumsum(np.where(nan_mask, 0.0, values), axis=0, dtype=np.float64, out=sums[1:])
+    np.cumsum(~nan_mask, axis=0, out=counts[1:])
+
+    # Mean is NaN if no games, or only NaN values, were played
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums / counts).astype(values.dtype, copy=False)
+
+
+def __expanding_mean_prior_loop(values : np.ndarray) -> np.ndarray:
+    """
+    Loop implementation of expanding_mean_prior for compiling with numba
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        array of shape (n_games, n_features) of game stats
+
+    Returns
+    -------
+    means : numpy.ndarray
+        array of shape (n_games + 1, n_features) of prior mean stats
+    """
+
+    n_games, n_features = values.shape
+    means = np.empty((n_games + 1, n_features), dtype=values.dtype)
+    sums = np.zeros(n_features)
+    counts = np.zeros(n_features)
+
+    for ii in range(n_games + 1):
+        # Mean is NaN if no games, or only NaN values, were played
+        for jj in range(n_features):
+            if counts[jj] > 0:
+                means[ii, jj] = sums[jj] / counts[jj]
+            else:
+                means[ii, jj] = np.nan
+
+        # Accumulate iith game, ignoring NaNs
+        if ii < n_games:
+            for jj in range(n_features):
+                if not np.isnan(values[ii, jj]):
+                    sums[jj] += values[ii, jj]
+                    counts[jj] += 1
+
+    return means
+
+
+if njit is not None:
+    __expanding_mean_prior = njit(cache=True)(__expanding_mean_prior_loop)
+else:
+    __expanding_mean_prior = __expanding_mean_prior_numpy
+
+
+def expanding_mean_prior(values : np.ndarray) -> np.ndarray:
+    """
+    Compute the mean of each feature over all games prior to each game,
+    ignoring NaNs, for games sorted by date.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        array of shape (n_games, n_features) of game stats sorted by date
+
+    Returns
+    -------
+    means : numpy.ndarray
+        array of shape (n_games + 1, n_features), with the same dtype as
+        values, whose kth row is the mean of each feature over the first k
+        games. Means are NaN if there are no non-NaN values to average. Sums
+        are accumulated in float64 regardless of dtype.
+    """
+
+    return __expanding_mean_prior(np.ascontiguousarray(values))
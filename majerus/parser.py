@@ -13,13 +13,16 @@ kenpom and sportsference names.
 """
 
 import re
+import sys
+import functools
 import unicodedata
 import string
-import numpy as np
-from typing import Union
+import pandas as pd
+from typing import Sequence, Union
 
 
-__all__ = ["name_normalizer", "conf_name_normalizer", "get_all_teams", "get_all_confs"]
+__all__ = ["name_normalizer", "name_normalizer_array", "conf_name_normalizer",
+           "normalize_any", "get_all_teams", "get_all_confs"]
 
 
 ### Dictionary of all NCAA men's basketball team names from 2010-2011-present ###
@@ -551,9 +554,166 @@ __conf_name = {"mid-eastern athletic conference" : "meac",
               "gwc" : "great-west",
               "ind" : "ind"}
 
+# Add conference names with directional division suffixes, like big ten (east),
+# also allowing spaces in place of - in short names, like sun belt (west)
+__conf_name.update({alias + suffix : v for k, v in list(__conf_name.items())
+                    for alias in (k, k if " " in k else k.replace("-", " "))
+                    for suffix in (" (east)", " (west)", " (south)", " (north)")})
 
-def name_normalizer(name : str, made_tourney : bool=False,
-                    return_both : bool=False, ignore_errors : bool=False) -> Union[str, bool]:
+# Intern names so duplicated standardized names share a single string object
+__team_names = {sys.intern(k) : sys.intern(v) for k, v in __team_names.items()}
+__conf_name = {sys.intern(k) : sys.intern(v) for k, v in __conf_name.items()}
+
+# Ordered unique standardized team, conference names
+_ALL_TEAMS = tuple(sorted(set(__team_names.values())))
+_ALL_CONFS = tuple(sorted(set(__conf_name.values())))
+
+# Combined team and conference names tagged by kind. Team names take precedence
+# for names that are both, e.g. southern
+_COMBINED = {**{k : ("conf", v) for k, v in __conf_name.items()},
+             **{k : ("team", v) for k, v in __team_names.items()}}
+
+
+# Value for unknown names when ignoring errors
+_NAN = float("nan")
+
+
+# Translation table for name_normalizer: drop junk characters not present in
+# team urls and convert - between name and location into a space
+_JUNK_TABLE = str.maketrans({"-" : " ", "&" : None, "(" : None, ")" : None,
+                             "'" : None, "." : None})
+
+# Whitespace between words in a team name, replaced by - in team urls
+_WS = re.compile(r"\s+")
+
+# Standalone UC in a -joined team name, replaced by california
+_UC = re.compile(r"(?<![^-])uc(?![^-])")
+
+
+def _build_trie(names : dict) -> dict:
+    """
+    Build a trie of nested dictionaries over the -separated words of the keys
+    of names, where the None key of a node holds the value of the name ending
+    at that node.
+
+    Parameters
+    ----------
+    names : dict
+        mapping of names to standardized names
+
+    Returns
+    -------
+    trie : dict
+        root node of the trie
+    """
+
+    trie = {}
+    for key, value in names.items():
+        node = trie
+        for word in key.split("-"):
+            node = node.setdefault(word, {})
+        node[None] = value
+
+    return trie
+
+
+# Trie of team names, used to match unknown names by their longest valid prefix
+_TEAM_TRIE = _build_trie(__team_names)
+
+
+def _lookup_trie(name : str) -> str:
+    """
+    Find the standardized team name for the longest valid team name that name
+    starts with, e.g. duke-blue-devils -> duke. Valid names that are the start
+    of other valid names, like kansas for kansas-state, are ambiguous and are
+    not matched.
+
+    Parameters
+    ----------
+    name : str
+        cleaned CBB team name
+
+    Returns
+    -------
+    parsed_name : str
+        standardized name, or None if name does not unambiguously start with
+        a valid name
+    """
+
+    parsed_team = None
+    node = _TEAM_TRIE
+    for word in name.split("-"):
+        node = node.get(word)
+        if node is None:
+            break
+        if None in node:
+            parsed_team = node[None] if len(node) == 1 else None
+
+    return parsed_team
+
+
+@functools.lru_cache(maxsize=8192)
+def _name_normalizer_core(name : str) -> tuple:
+    """
+    Clean up a team name string and map it to its standardized name. Results
+    are cached since the same names are normalized many times over a season.
+
+    Parameters
+    ----------
+    name : str
+        CBB team name, like Duke
+
+    Returns
+    -------
+    parsed_name : str
+        cleaned name, or None if it does not correspond to a valid team
+    cleaned_name : str
+        cleaned name prior to mapping, used for error messages
+    made_tourney : int
+        1 if team made the NCAA tourney, 0 if not
+    """
+
+    # Clean up team name, only normalizing unicode or lowering case if needed
+    if not name.isascii():
+        name = unicodedata.normalize("NFKD", name)
+    if not name.islower():
+        name = name.lower()
+    parsed_team = name.strip()
+
+    # Special case: "st." - replace in "saint" or "state" depending on context
+    if "st." in parsed_team:
+        if parsed_team.startswith("st. ") or parsed_team == "st.":
+            parsed_team = "saint" + parsed_team[3:]
+        elif parsed_team.endswith(" st."):
+            parsed_team = parsed_team[:-3] + "state"
+        # Weird cases where st in middle can be state or saint
+        else:
+            pass
+
+    # Remove junk characters not present in team url and split on - between
+    # name and location in a single pass
+    parsed_team = parsed_team.translate(_JUNK_TABLE)
+
+    # Did they make the tourney? If so, drop the trailing ncaa
+    parsed_team = parsed_team.strip()
+    if parsed_team.endswith(" ncaa") or parsed_team == "ncaa":
+        b_march_madness = 1
+        parsed_team = parsed_team[:-4]
+    else:
+        b_march_madness = 0
+
+    # Tokenize, joining words with - and removing blank characters
+    parsed_team = _WS.sub("-", parsed_team.strip())
+
+    # Convert UC -> California since there's a lot of UCs in D1
+    parsed_team = _UC.sub("california", parsed_team)
+
+    # Now correctly map name to url form
+    return __team_names.get(parsed_team), parsed_team, b_march_madness
+
+
+def name_normalizer(name : str, made_tourney : bool=False, return_both : bool=False,
+                    ignore_errors : bool=False, match_prefix : bool=False) -> Union[str, bool]:
     """
     Convert MCBB to a standardized name for using with scraping and interacting
     with data from https://www.sports-reference.com/cbb. Since NCAA is present
@@ -571,8 +731,14 @@ def name_normalizer(name : str, made_tourney : bool=False,
         Whether or not to return both the parsed_name and whether or not that
         team made the tourney. Defaults to False.
     ignore_errors : bool (optional)
-        Whether or not to ignore name errors and replace unknown teams with NaN.
+        Whether or not to ignore name errors and replace unknown teams with NaN,
+        and 0 for whether or not they made the tourney.
         Defaults to False so invalid names will throw a KeyError
+    match_prefix : bool (optional)
+        Whether or not to map invalid names to the valid team name they
+        unambiguously start with, e.g. Duke Blue Devils -> duke. Defaults to
+        False since non-D1 schools can start with D1 names, e.g. Kentucky
+        Wesleyan.
 
     Returns
     -------
@@ -581,65 +747,169 @@ def name_normalizer(name : str, made_tourney : bool=False,
     made_tourney : bool (optional)
     """
 
-    # Clean up team name
-    parsed_team = unicodedata.normalize("NFKD", str(name)).lower().strip()
+    # Ensure name is a string
+    if type(name) is not str:
+        name = str(name)
 
-    # Special case: "st." - replace in "saint" or "state" depending on context
-    if "st." in parsed_team:
-        tmp = parsed_team.split()
-        if tmp[0] == "st.":
-            parsed_team = parsed_team.replace("st.", "saint")
-        elif tmp[-1] == "st.":
-            parsed_team = parsed_team.replace("st.", "state")
-        # Weird cases where st in middle can be state or saint
+    # Fast path: name is already in standardized form, so no cleaning needed
+    parsed_team = __team_names.get(name)
+    if parsed_team is not None:
+        b_march_madness = 0
+    else:
+        # Clean up and map team name using the cached core
+        parsed_team, cleaned_team, b_march_madness = _name_normalizer_core(name)
+
+        # Optionally fall back to the valid team name that name starts with
+        if parsed_team is None and match_prefix:
+            parsed_team = _lookup_trie(cleaned_team)
+
+        # Ensure name is valid
+        if parsed_team is None:
+            # Ignore error -> return NaN, unknown teams did not make the tourney
+            if ignore_errors:
+                if return_both:
+                    return _NAN, 0
+                return 0 if made_tourney else _NAN
+            else:
+                err_msg = f"Incorrect team name: {cleaned_team}. See this function's docs for valid names."
+                suggestion = _lookup_trie(cleaned_team)
+                if suggestion is not None:
+                    err_msg += f" Did you mean {suggestion}?"
+                raise KeyError(err_msg)
+
+    # Return correct info
+    if return_both:
+        return parsed_team, b_march_madness
+    else:
+        if not made_tourney:
+            return parsed_team
         else:
-            pass
+            return b_march_madness
 
-    # Remove junk characters not present in team url
-    for char in ["&", "(", ")", "'", "."]:
-        parsed_team = parsed_team.replace(char, "")
 
-    # Special case: - between name and location
-    parsed_team = parsed_team.replace("-", " ")
+def name_normalizer_array(names : Union[Sequence, pd.Series], made_tourney : bool=False,
+                          return_both : bool=False, ignore_errors : bool=False,
+                          match_prefix : bool=False) -> pd.Series:
+    """
+    Vectorized version of name_normalizer that converts an array of MCBB team
+    names to standardized names using pandas' string methods, e.g. for
+    normalizing an entire column of a dataframe at once.
 
-    # Tokenize
-    parsed_team = parsed_team.split(" ")
+    Parameters
+    ----------
+    names : array-like, like a list, numpy.ndarray or pandas.Series
+        CBB team names, like Duke
+    made_tourney : bool (optional)
+        Whether or not team made the NCCA tourney. Defaults to False. If True,
+        returns 1 if team made the tourney, 0 if not, after parsed_names
+    return_both : bool (optional)
+        Whether or not to return both the parsed_names and whether or not those
+        teams made the tourney. Defaults to False.
+    ignore_errors : bool (optional)
+        Whether or not to ignore name errors and replace unknown teams with NaN,
+        and 0 for whether or not they made the tourney.
+        Defaults to False so invalid names will throw a KeyError
+    match_prefix : bool (optional)
+        Whether or not to map invalid names to the valid team name they
+        unambiguously start with. Defaults to False. See name_normalizer.
+
+    Returns
+    -------
+    parsed_names : pandas.Series (optional)
+        cleaned names, indexed like names if names is a pandas.Series
+    made_tourney : pandas.Series (optional)
+    """
+
+    # Only clean up each unique team name once since names repeat many times
+    names = pd.Series(names).astype(str)
+    unique_names = pd.Series(names.unique())
+
+    # Clean up team names
+    parsed_teams = unique_names.str.normalize("NFKD").str.lower().str.strip()
+
+    # Special case: "st." - replace in "saint" or "state" depending on context
+    first_st = parsed_teams.str.match(r"st\.(?: |$)")
+    last_st = ~first_st & parsed_teams.str.endswith(" st.")
+    parsed_teams = parsed_teams.mask(first_st, "saint" + parsed_teams.str[3:])
+    parsed_teams = parsed_teams.mask(last_st, parsed_teams.str[:-3] + "state")
+
+    # Remove junk characters not present in team url and split on - between
+    # name and location in a single pass
+    parsed_teams = parsed_teams.str.translate(_JUNK_TABLE)
+
+    # Tokenize, joining words with - and removing blank characters
+    parsed_teams = parsed_teams.str.strip().str.replace(_WS, "-", regex=True)
 
     # Convert UC -> California since there's a lot of UCs in D1
-    parsed_team = ["california" if wd == "uc" else wd for wd in parsed_team]
+    parsed_teams = parsed_teams.str.replace(_UC, "california", regex=True)
 
-    # Remove blank characters
-    parsed_team = [el for el in parsed_team if el]
+    # Did they make the tourney? If so, drop the trailing ncaa
+    b_march_madness = parsed_teams.str.contains(r"(?:^|-)ncaa$").astype(int)
+    parsed_teams = parsed_teams.mask(b_march_madness == 1,
+                                     parsed_teams.str.replace(r"-?ncaa$", "", regex=True))
 
-    # Did they make the tourney?
-    if "ncaa" in parsed_team:
-        b_march_madness = 1
-        parsed_team = "-".join(parsed_team[:-1])
-    else:
-        b_march_madness = 0
-        parsed_team = "-".join(parsed_team)
+    # Now correctly map names to url form and ensure they're valid
+    mapped_teams = parsed_teams.map(__team_names)
 
-    # Now correctly map name to url form and ensure it's valid
-    try:
-        parsed_team = __team_names[parsed_team]
-    except KeyError:
-        # Ignore error -> set to NaN
-        if ignore_errors:
-            parsed_team = np.nan
-        else:
-            err_msg = f"Incorrect team name: {parsed_team}. See this function's docs for valid names."
+    # Optionally fall back to the valid team names that names start with
+    if match_prefix and mapped_teams.isna().any():
+        mapped_teams = mapped_teams.fillna(parsed_teams[mapped_teams.isna()].map(_lookup_trie))
+
+    if not ignore_errors:
+        missing = mapped_teams.isna()
+        if missing.any():
+            cleaned_team = parsed_teams[missing].iloc[0]
+            err_msg = f"Incorrect team name: {cleaned_team}. See name_normalizer's docs for valid names."
+            suggestion = _lookup_trie(cleaned_team)
+            if suggestion is not None:
+                err_msg += f" Did you mean {suggestion}?"
             raise KeyError(err_msg)
 
+    # Unknown teams did not make the tourney
+    b_march_madness = b_march_madness.mask(mapped_teams.isna(), 0)
+
+    # Map results for unique names back onto all names
+    mapped_teams = names.map(pd.Series(mapped_teams.values, index=unique_names))
+    b_march_madness = names.map(pd.Series(b_march_madness.values, index=unique_names))
+
     # Return correct info
     if return_both:
-        return parsed_team, b_march_madness
+        return mapped_teams, b_march_madness
     else:
         if not made_tourney:
-            return parsed_team
+            return mapped_teams
         else:
             return b_march_madness
 
 
+@functools.lru_cache(maxsize=8192)
+def _conf_name_normalizer_core(name : str) -> str:
+    """
+    Clean up a conference name string and map it to its standardized name.
+    Results are cached since the same names are normalized many times.
+
+    Parameters
+    ----------
+    name : str
+        Conference team name, like Athletic Coast Conference, or acc
+
+    Returns
+    -------
+    parsed_conf : str
+        cleaned name, or None if it does not correspond to a valid conference
+    """
+
+    # Clean up conference name, only normalizing unicode or lowering case if needed
+    if not name.isascii():
+        name = unicodedata.normalize("NFKD", name)
+    if not name.islower():
+        name = name.lower()
+    parsed_conf = name.strip()
+
+    # Now correctly map name to url form
+    return __conf_name.get(parsed_conf)
+
+
 def conf_name_normalizer(name : str,
                          ignore_errors : bool=False) -> str:
     """
@@ -663,20 +933,14 @@ def conf_name_normalizer(name : str,
         cleaned name
     """
 
-    # Clean up team name
-    parsed_conf = unicodedata.normalize("NFKD", name).lower().strip()
-
-    # If (east) or (west) is after conference name, remove it
-    if "(east)" in parsed_conf or "(west)" in parsed_conf or "(south)" in parsed_conf or "(north)" in parsed_conf:
-        parsed_conf = "-".join(parsed_conf.split(" ")[:-1])
+    # Clean up and map conference name using the cached core
+    parsed_conf = _conf_name_normalizer_core(name)
 
-    # Now correctly map name to url form and ensure it's valid
-    try:
-        parsed_conf = __conf_name[parsed_conf]
-    except KeyError:
+    # Ensure name is valid
+    if parsed_conf is None:
         # Ignore error -> set to NaN
         if ignore_errors:
-            parsed_conf = np.nan
+            parsed_conf = _NAN
         else:
             err_msg = "Incorrect conference name: {parsed_conf}. See this function's docs for valid names."
             raise KeyError(err_msg)
@@ -684,6 +948,55 @@ def conf_name_normalizer(name : str,
     return parsed_conf
 
 
+def normalize_any(name : str, ignore_errors : bool=False) -> tuple:
+    """
+    Convert a name that may be either a MCBB team or conference name to its
+    standardized name, identifying which kind of name it is. Names that are
+    valid for both, like southern, are treated as team names.
+
+    Example: Atlantic Coast Conference -> ("conf", "acc")
+
+    Parameters
+    ----------
+    name : str
+        CBB team or conference name, like Duke or acc
+    ignore_errors : bool (optional)
+        Whether or not to ignore name errors and replace unknown names with NaN.
+        Defaults to False so invalid names will throw a KeyError
+
+    Returns
+    -------
+    kind : str
+        "team" or "conf"
+    parsed_name : str
+        cleaned name
+    """
+
+    # Ensure name is a string
+    if type(name) is not str:
+        name = str(name)
+
+    # Fast path: name is already in standardized form
+    result = _COMBINED.get(name)
+    if result is not None:
+        return result
+
+    # Otherwise, try to clean up name as a team, then as a conference
+    parsed_team = _name_normalizer_core(name)[0]
+    if parsed_team is not None:
+        return "team", parsed_team
+    parsed_conf = _conf_name_normalizer_core(name)
+    if parsed_conf is not None:
+        return "conf", parsed_conf
+
+    # Ignore error -> set to NaN
+    if ignore_errors:
+        return _NAN, _NAN
+    else:
+        err_msg = f"Incorrect team or conference name: {name}. See name_normalizer, conf_name_normalizer docs for valid names."
+        raise KeyError(err_msg)
+
+
 def get_all_teams() -> list:
     """
     Return a parsed, ordered list of all unique NCAAB team names.
@@ -697,7 +1010,7 @@ def get_all_teams() -> list:
             List of team names
     """
 
-    return list(np.sort(list(set(__team_names.values()))))
+    return list(_ALL_TEAMS)
 
 
 def get_all_confs() -> list:
@@ -713,4 +1026,4 @@ def get_all_confs() -> list:
             List of conference names
     """
 
-    return list(np.sort(list(set(__conf_name.values()))))
\ No newline at end of file
+    return list(_ALL_CONFS)
\ No newline at end of file
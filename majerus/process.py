@@ -14,175 +14,309 @@ import pandas as pd
 import numpy as np
 import os
 from . import parser
+from ._kernels import expanding_mean_prior
 
 
-__all__ = ["process_game_logs"]
+__all__ = ["process_game_logs", "process_season_game_logs"]
 
 
-def __home_name(location : str, team : str, opponent : str) -> str:
+# Features for each team
+FEATURE_COLS = ('FGA', 'FG%', 'PF', '3P%', 'FT%', 'ORtg', 'DRtg', 'Pace',
+                'FTr', '3PAr', 'TS%', 'TRB%', 'AST%', 'STL%', 'BLK%',
+                'eFG%', 'TOV%', 'ORB%', 'FT/FGA', 'DRB%')
+
+# Final dataframe columns: features for team, opponent, then game metadata
+TEAM_COLS = tuple("team_" + col for col in FEATURE_COLS)
+OPP_COLS = tuple("opp_" + col for col in FEATURE_COLS)
+FINAL_COLS = TEAM_COLS + OPP_COLS + ('team_name', 'opponent_name', 'team_at_home',
+                                     'neutral_site', "team_won", "total_score",
+                                     "Date", "Location", "home_name")
+
+
+def _prior_means(team_df : pd.DataFrame, feature_cols : list) -> tuple:
     """
-    Simple function to identify name of home team
+    Compute the mean of each feature over all of a team's games played before
+    each of its games, ignoring NaNs.
 
     Parameters
     ----------
-    location : str
-        Home (H), Away (A), or neutral site (N)
-    team : str
-        Team name
-    opponent : str
-        Opponent name
-    
+    team_df : pandas.DataFrame
+        gamelogs for a single team
+    feature_cols : list
+        names of feature columns to aggregate
+
     Returns
     -------
-    home_name : str
-        Name of home team
+    dates : numpy.ndarray
+        sorted dates of the team's games
+    means : numpy.ndarray
+        array of shape (len(team_df) + 1, len(feature_cols)) whose kth row is
+        the mean of each feature over the team's first k games. Use
+        np.searchsorted(dates, date) to find k for games played before date.
     """
-    if location == "H" or location == "N":
-        return team
-    else:
-        return opponent
 
+    # Game stats have only a few significant figures, so aggregate them in
+    # single precision to halve memory traffic
+    team_df = team_df.sort_values("Date", kind="stable")
+    means = expanding_mean_prior(team_df[feature_cols].to_numpy(dtype=np.float32))
 
-def process_game_logs(df : pd.DataFrame, team : str, 
-                      skip_first_n : str=10, verbose : bool=False) -> pd.DataFrame:
+    return team_df["Date"].to_numpy(), means
+
+
+def _add_metadata(df : pd.DataFrame) -> pd.DataFrame:
     """
-    Process game_logs from df into a dataframe where each row
-    corresponds to a single game from each team. The columns, or features, are
-    the statistics for team and its opponent, aggregated over all prior games
-    that season, ignoring the skip_first_n in the season.
+    Add columns identifying the home team, location indicators and total score
+    to a season's gamelogs, and ensure dates have the correct type.
 
     Parameters
     ----------
     df : pandas.DataFrame
-        dataframe of gamelogs file loaded in via something like the following:
-        df = os.path.join("../Data","allGamelogs20172018.csv", header=0, index_col=0)
-    team : str
-        name of D1 college basketball team
-    skip_first_n : int (optional)
-        Number of games to ignore before making records. Defaults to 10, that is,
-        the 1st 10 games of each team are neglected. Starting with the 11th game,
-        all prior stats are aggregated to make the features. The idea is that it takes
-        some time, roughly skipFirstNGames, before a team's stats become representative
-        of the team's actual ability. This is a quantity that can and should be
-        further optimized.
-    verbose : bool (optional)
-        Whether or not to output debug and diagnostic information. Defaults to False.
+        dataframe of gamelogs
 
     Returns
     -------
-    df_agg : pandas.DataFrame
-        data frame of processed/aggregated results such that each row containes
-        the mean stats of team and opponent for a game given the previously
-        played games, ignoring the first skipFirstNGames games. Returns None if
-        given team did not play D1 basketball that season.
+    df : pandas.DataFrame
+        shallow copy of df with team, opponent names and locations stored as
+        categoricals. Metadata columns are also added to df itself.
     """
 
-    # First ensure team name is valid, catch errors, then normalize name if valid
-    parsed_team = parser.name_normalizer(team, made_tourney=False,
-                                         return_both=False, ignore_errors=False)
-
-    # Figure out name of home team to help identify unique games
-    df["home_name"] = df.apply(lambda x : __home_name(x["Location"], x["Team"], x["Opponent"]),
-                               axis=1)
+    # Figure out name of home team to help identify unique games. Team is
+    # considered the home team for games at a neutral site
+    location = df["Location"].to_numpy()
+    df["home_name"] = np.where((location == "H") | (location == "N"),
+                               df["Team"].to_numpy(), df["Opponent"].to_numpy())
 
     # Add additional columns of interest
-    df["team_at_home"] = pd.Series(df["Location"] == "H", index=df.index, dtype=int)
-    df["neutral_site"] = pd.Series(df["Location"] == "N", index=df.index, dtype=int)
+    df["team_at_home"] = (location == "H").astype(np.int8)
+    df["neutral_site"] = (location == "N").astype(np.int8)
     df["total_score"] = df["TeamPoints"] + df["OpponentPoints"]
-    df['Date'] =  pd.to_datetime(df['Date'], format="%Y-%m-%d")
+    df['Date'] =  pd.to_datetime(df['Date'].values, format="%Y-%m-%d", cache=True)
 
-    # Define features for each team
-    featureCols = ['FGA', 'FG%', 'PF', '3P%', 'FT%', 'ORtg', 'DRtg', 'Pace',
-                   'FTr', '3PAr', 'TS%', 'TRB%', 'AST%', 'STL%', 'BLK%',
-                   'eFG%', 'TOV%', 'ORB%', 'FT/FGA', 'DRB%']
+    # Store names and locations as categoricals since there are only a few
+    # unique values, speeding up grouping by team. Convert them on a copy so
+    # the caller's columns keep their types
+    df = df.copy(deep=False)
+    for col in ("Team", "Opponent", "Location"):
+        df[col] = df[col].astype("category")
 
-    # Make list for final dataframe columns
-    team_cols = []
-    opp_cols = []
+    return df
 
-    for col in feature_cols:
-        # Save columns for team
-        team_cols.append("team_" + col)
 
-        # Save columns for opponent
-        opp_cols.append("opp_" + col)
+def _build_games(parsed_team : str, team_df : pd.DataFrame, groups,
+                 prior_means : dict, skip_first_n : int) -> pd.DataFrame:
+    """
+    Build the dataframe of aggregated team and opponent stats for each of a
+    team's games, ignoring the team's first skip_first_n games.
 
-    # Add metadata, predictive features to finalCols
-    final_cols = team_cols + opp_cols
-    final_cols += ['team_name', 'opponent_name', 'team_at_home', 'neutral_site', "team_won",
-                  "total_score", "Date", "Location", "home_name"]
+    Parameters
+    ----------
+    parsed_team : str
+        normalized name of team
+    team_df : pandas.DataFrame
+        gamelogs for team
+    groups : pandas.core.groupby.DataFrameGroupBy
+        season's gamelogs grouped by team
+    prior_means : dict
+        cache of _prior_means results for each team, or None for teams without
+        gamelogs, filled in as needed so it can be shared across teams
+    skip_first_n : int
+        Number of games to ignore before making records
 
-    if verbose:
-        print(parsed_team)
+    Returns
+    -------
+    df_agg : pandas.DataFrame
+        data frame of processed/aggregated results for team
+    """
 
-    # Get group corresponding to all gamelogs for team
-    groups = df.groupby("Team")
-    try:
-        teamDf = groups.get_group(parsed_team)
-    except KeyError as error:
-        print(f"No data for {parsed_team}")
-        return None
+    feature_cols = list(FEATURE_COLS)
+
+    # Mean stats prior to each game for team
+    if parsed_team not in prior_means:
+        prior_means[parsed_team] = _prior_means(team_df, feature_cols)
+    team_dates, team_means = prior_means[parsed_team]
+
+    # Preallocate arrays for team, opponent aggregate stats and game metadata
+    n_max = max(len(team_df) - skip_first_n, 0)
+    n_features = len(FEATURE_COLS)
+    features = np.empty((n_max, 2 * n_features), dtype=np.float32)
+    opponent_names = np.empty(n_max, dtype=object)
+    team_at_home = np.empty(n_max, dtype=np.int8)
+    neutral_site = np.empty(n_max, dtype=np.int8)
+    team_won = np.empty(n_max, dtype=np.int8)
+    total_score = np.empty(n_max, dtype=np.float32)
+    dates = np.empty(n_max, dtype=team_dates.dtype)
+    locations = np.empty(n_max, dtype=object)
+    home_names = np.empty(n_max, dtype=object)
+
+    # Pull out team's columns once rather than indexing rows in the loop
+    game_opponents = team_df["Opponent"].to_numpy(dtype=object)
+    game_dates = team_df["Date"].to_numpy()
+    game_at_home = team_df["team_at_home"].to_numpy()
+    game_neutral_site = team_df["neutral_site"].to_numpy()
+    game_team_won = team_df["team_won"].to_numpy()
+    game_total_score = team_df["total_score"].to_numpy()
+    game_locations = team_df["Location"].to_numpy(dtype=object)
+    game_home_names = team_df["home_name"].to_numpy(dtype=object)
 
     # Loop over games, see if home team wins, skipping first 10 games (no previous statistics)
-    games = []
-    for ii in range(skip_first_n, len(team_tf)):
+    n_games = 0
+    for ii in range(skip_first_n, len(team_df)):
         # Figure out the opponent for the iith game
-        opp = team_df.iloc[ii]["Opponent"]
-
-        # Select all games team played prior to iith game
-        # Just select feature columns treating tmp as team
-        tmp = team_df[team_df["Date"] < team_df.iloc[ii]["Date"]].copy()
-
-        # Now, loop through each game and for each opponent, do
-        # a similar operation to get their aggregate statistics
-        try:
-            opp_df = groups.get_group(opp)
-            opp_tmp = opp_df[opp_df["Date"] < team_df.iloc[ii]["Date"]].copy()
-        except KeyError as error:
+        opp = game_opponents[ii]
+        date = game_dates[ii]
+
+        # Get opponent's mean stats prior to each of their games
+        if opp not in prior_means:
+            try:
+                prior_means[opp] = _prior_means(groups.get_group(opp), feature_cols)
+            except KeyError as error:
+                prior_means[opp] = None
+        if prior_means[opp] is None:
             print(f"No data for {opp}")
             continue
+        opp_dates, opp_means = prior_means[opp]
+
+        # Count games team and opponent played prior to iith game
+        n_team = np.searchsorted(team_dates, date, side="left")
+        n_opp = np.searchsorted(opp_dates, date, side="left")
 
         # If no games have been played, cannot compute stats
-        if opp_tmp.empty or tmp.empty:
+        if n_team == 0 or n_opp == 0:
             continue
 
-        # Now aggregate both team and opponent's dataframes since team's
-        # stats are in the home columns, and opp's are in away
-
-        # Flatten tmp, oppTmp
-        tmp = tmp[feature_cols].astype(float).aggregate(np.nanmean, axis=0)
-        oppTmp = opp_tmp[feature_cols].astype(float).aggregate(np.nanmean, axis=0)
-
         # Team, then opponent aggregate stats
-        game = list(tmp.values) + list(oppTmp.values)
+        features[n_games, :n_features] = team_means[n_team]
+        features[n_games, n_features:] = opp_means[n_opp]
 
-        # Store team, opponent names
-        game.append(parsed_team)
-        game.append(opp)
+        # Store opponent name
+        opponent_names[n_games] = opp
 
         # Add indicator variable for if team is at home
-        game.append(team_df.iloc[ii]["team_at_home"])
+        team_at_home[n_games] = game_at_home[ii]
 
         # Add indicator variable for if game is played at a neutral site
-        game.append(team_df.iloc[ii]["neutral_site"])
+        neutral_site[n_games] = game_neutral_site[ii]
 
         # Add indicator variable for if team won
-        game.append(team_df.iloc[ii]["team_won"])
+        team_won[n_games] = game_team_won[ii]
 
         # Add float for total score
-        game.append(team_df.iloc[ii]["total_score"])
+        total_score[n_games] = game_total_score[ii]
 
         # Save date, location, names of winning and home teams
-        game.append(team_df.iloc[ii]["Date"])
-        game.append(team_df.iloc[ii]["Location"])
+        dates[n_games] = date
+        locations[n_games] = game_locations[ii]
 
         # Save homeName to help identify games
-        game.append(team_df.iloc[ii]["home_name"])
+        home_names[n_games] = game_home_names[ii]
 
         # Save game
-        games.append(game)
+        n_games += 1
 
     # Make temporary dataframe from all games of team
-    df_agg = pd.DataFrame.from_records(games, columns=final_cols)
+    data = dict(zip(TEAM_COLS + OPP_COLS, features[:n_games].T))
+    data.update({'team_name' : parsed_team, 'opponent_name' : opponent_names[:n_games],
+                 'team_at_home' : team_at_home[:n_games], 'neutral_site' : neutral_site[:n_games],
+                 "team_won" : team_won[:n_games], "total_score" : total_score[:n_games],
+                 "Date" : dates[:n_games], "Location" : locations[:n_games],
+                 "home_name" : home_names[:n_games]})
+    df_agg = pd.DataFrame(data, columns=list(FINAL_COLS))
+
+    return df_agg
+
+
+def process_season_game_logs(df : pd.DataFrame, skip_first_n : int=10,
+                             verbose : bool=False) -> pd.DataFrame:
+    """
+    Process game_logs from df for every team in a season, like
+    process_game_logs, grouping the season's gamelogs and aggregating each
+    team's stats only once.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        dataframe of gamelogs file loaded in via something like the following:
+        df = os.path.join("../Data","allGamelogs20172018.csv", header=0, index_col=0)
+    skip_first_n : int (optional)
+        Number of games to ignore before making records. Defaults to 10. See
+        process_game_logs for details.
+    verbose : bool (optional)
+        Whether or not to output debug and diagnostic information. Defaults to False.
+
+    Returns
+    -------
+    df_agg : pandas.DataFrame
+        data frame of processed/aggregated results for all teams' games, see
+        process_game_logs for details.
+    """
+
+    df = _add_metadata(df)
+
+    # Group once, sharing each team's aggregated stats across all of its games
+    groups = df.groupby("Team", sort=False, observed=True)
+    prior_means = {}
+    results = []
+    for parsed_team, team_df in groups:
+        if verbose:
+            print(parsed_team)
+        results.append(_build_games(parsed_team, team_df, groups, prior_means, skip_first_n))
+
+    # No gamelogs -> no games
+    if not results:
+        return pd.DataFrame(columns=list(FINAL_COLS))
+
+    return pd.concat(results, ignore_index=True)
+
+
+def process_game_logs(df : pd.DataFrame, team : str, 
+                      skip_first_n : str=10, verbose : bool=False) -> pd.DataFrame:
+    """
+    Process game_logs from df into a dataframe where each row
+    corresponds to a single game from each team. The columns, or features, are
+    the statistics for team and its opponent, aggregated over all prior games
+    that season, ignoring the skip_first_n in the season.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        dataframe of gamelogs file loaded in via something like the following:
+        df = os.path.join("../Data","allGamelogs20172018.csv", header=0, index_col=0)
+    team : str
+        name of D1 college basketball team
+    skip_first_n : int (optional)
+        Number of games to ignore before making records. Defaults to 10, that is,
+        the 1st 10 games of each team are neglected. Starting with the 11th game,
+        all prior stats are aggregated to make the features. The idea is that it takes
+        some time, roughly skipFirstNGames, before a team's stats become representative
+        of the team's actual ability. This is a quantity that can and should be
+        further optimized.
+    verbose : bool (optional)
+        Whether or not to output debug and diagnostic information. Defaults to False.
+
+    Returns
+    -------
+    df_agg : pandas.DataFrame
+        data frame of processed/aggregated results such that each row containes
+        the mean stats of team and opponent for a game given the previously
+        played games, ignoring the first skipFirstNGames games. Returns None if
+        given team did not play D1 basketball that season.
+    """
+
+    # First ensure team name is valid, catch errors, then normalize name if valid
+    parsed_team = parser.name_normalizer(team, made_tourney=False,
+                                         return_both=False, ignore_errors=False)
+
+    df = _add_metadata(df)
+
+    if verbose:
+        print(parsed_team)
+
+    # Get group corresponding to all gamelogs for team
+    groups = df.groupby("Team", observed=True)
+    try:
+        team_df = groups.get_group(parsed_team)
+    except KeyError as error:
+        print(f"No data for {parsed_team}")
+        return None
 
-    return df_agg
\ No newline at end of file
+    return _build_games(parsed_team, team_df, groups, {}, skip_first_n)
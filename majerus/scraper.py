@@ -9,19 +9,107 @@ data from men's college basketball reference: https://www.sports-reference.com/c
 
 # Imports
 import requests
+import lxml.html
 import pandas as pd
 import numpy as np
 import unicodedata
 import string
 import os
 import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from . import parser
 import numpy as np
 
 
 __all__ = ["scrape_team_game_logs_basic", "scrape_team_game_logs_adv",
-           "scrape_team_game_logs"]
+           "scrape_team_game_logs", "scrape_season_game_logs"]
+
+
+# Per-thread sessions so connections to sports-reference are reused across
+# requests, since sessions are not safe to share between threads
+_LOCAL = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """
+    Get the current thread's requests session, creating it if needed
+
+    Returns
+    -------
+    session : requests.Session
+        session for the current thread
+    """
+
+    session = getattr(_LOCAL, "session", None)
+    if session is None:
+        session = _LOCAL.session = requests.Session()
+
+    return session
+
+
+def _parse_table(html : bytes, table_id : str) -> pd.DataFrame:
+    """
+    Parse the table with id table_id from html into a dataframe of strings
+    indexed by its 2nd column, e.g. the date for gamelogs. Like pd.read_html
+    with header=1 and index_col=1, the 2nd row of the table is used as the
+    column names, with blank names replaced by "Unnamed: i" and duplicate names
+    suffixed by ".1", ".2", etc., and blank or missing cells are NaN.
+
+    Parameters
+    ----------
+    html : bytes
+        html content of the page containing the table
+    table_id : str
+        id attribute of the table
+
+    Returns
+    -------
+    df : pd.DataFrame
+        dataframe containing the table's rows below its column names
+    """
+
+    tables = lxml.html.fromstring(html).xpath(f"//table[@id='{table_id}']")
+    if not tables:
+        raise ValueError(f"No table found with id {table_id}")
+
+    # Extract text of each row's cells, repeating cells that span columns
+    rows = []
+    for tr in tables[0].xpath("./thead/tr | ./tbody/tr | ./tfoot/tr | ./tr"):
+        row = []
+        for cell in tr.xpath("./th | ./td"):
+            text = " ".join(cell.text_content().split())
+            row.extend([text] * int(cell.get("colspan", 1)))
+        rows.append(row)
+
+    # Pad rows with blanks to the widest row
+    n_cols = max(len(row) for row in rows)
+    rows = [row + [""] * (n_cols - len(row)) for row in rows]
+
+    # Column names from the 2nd row, deduplicating like pandas
+    columns = []
+    seen = {}
+    for ii, name in enumerate(rows[1]):
+        if not name:
+            name = f"Unnamed: {ii}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+
+    # Collect values into columns, replacing blanks with NaN
+    values = [[] for _ in range(n_cols)]
+    for row in rows[2:]:
+        for column, text in zip(values, row):
+            column.append(text if text else np.nan)
+
+    df = pd.DataFrame(dict(zip(columns, values)), columns=columns, dtype=object)
+
+    return df.set_index(columns[1])
 
 
 def scrape_team_game_logs_basic(team : str, season : int, verbose : bool=False,
@@ -71,13 +159,12 @@ def scrape_team_game_logs_basic(team : str, season : int, verbose : bool=False,
     # Initialize gamelog
     url = f"http://www.sports-reference.com/cbb/schools/{parsed_team}/{season}-gamelogs.html"
 
-    # Scrape using requests
+    # Scrape using this thread's requests session
     try: 
-        r = requests.get(url, proxies=proxies, headers=headers)
+        r = _get_session().get(url, proxies=proxies, headers=headers, timeout=30)
         if r.status_code < 400:
-            # Parse response data using pandas after successful request
-            df = pd.read_html(r.content, parse_dates=True, attrs={'id': 'sgl-basic_NCAAM'},
-                                header=1, index_col=1)[0]
+            # Parse gamelog table from response data after successful request
+            df = _parse_table(r.content, "sgl-basic_NCAAM")
         else: 
             print(f"Failed request with status code {r.status_code}") 
             return None
@@ -90,7 +177,8 @@ def scrape_team_game_logs_basic(team : str, season : int, verbose : bool=False,
     df = df[df.index != "Date"].copy()
 
     # Explicitely make date index a datetime
-    df.index = pd.to_datetime(df.index, format="%Y-%m-%d")
+    df.index = pd.DatetimeIndex(np.asarray(df.index.values, dtype="datetime64[D]"),
+                                name=df.index.name)
 
     # Rename, drop junk columns
     df.drop(columns=["Unnamed: 23", "G"], inplace=True)
@@ -99,35 +187,37 @@ def scrape_team_game_logs_basic(team : str, season : int, verbose : bool=False,
 
     # Parse location to be H, A, or N for home, away, or neutral
     df["location"] = df["location"].fillna("H")
-    df["location"] = df["location"].apply(lambda x : "A" if x == "@" else x)
+    df["location"] = df["location"].where(df["location"] != "@", "A")
 
     # Set team, opponent names and drop NaNs (aka non-D1 teams)
     if normalize_names:
-        df["team"] = pd.Series([parsed_team for _ in range(len(df))], index=df.index)
-        df["Opp"] = df["Opp"].apply(parser.name_normalizer, **{"ignore_errors" : True})
+        df["team"] = parsed_team
+        # Normalize each unique opponent once rather than once per game
+        opp_names = {opp : parser.name_normalizer(opp, ignore_errors=True)
+                     for opp in df["Opp"].dropna().unique()}
+        df["Opp"] = df["Opp"].map(opp_names)
     else:
-        df["team"] = pd.Series([team for _ in range(len(df))], index=df.index)
+        df["team"] = team
     df.dropna(subset=["Opp"], axis=0, inplace=True)
 
-    # Change W/L column to be 0/1 indicator variable for if Team won
-    df["team_won"] = df["W/L"].copy()
-    df.drop(columns=["W/L"], axis=0, inplace=True)
+    # Change W/L column to be 0/1 indicator variable for if Team won. Disregard
+    # OT results, only whether Team won or lost, so only the W or L matters
+    df["team_won"] = (df["W/L"].astype(str).str[0] == "W").astype(np.int8)
+    df.drop(columns=["W/L"], inplace=True)
 
-    # Correct data type of the data frame
-    dtypes = {'Opp' : str, 'team_won' : str, 'Tm' : np.float64, 'Opp.1' : np.float64, 'FG' : np.float64,
+    # Correct data type of the data frame, storing names and locations as
+    # categoricals since there are only a few unique values
+    dtypes = {'Opp' : "category", 'Tm' : np.float64, 'Opp.1' : np.float64, 'FG' : np.float64,
             'FGA' : np.float64, 'FG%' : np.float64, '3P' : np.float64, '3PA' : np.float64,
             '3P%' : np.float64, 'FT' : np.float64, 'FTA' : np.float64, 'FT%' : np.float64, 'ORB' : np.float64,
             'TRB' : np.float64, 'AST' : np.float64, 'STL' : np.float64, 'BLK' : np.float64, 'TOV' : np.float64,
             'PF' : np.float64, 'FG.1' : np.float64, 'FGA.1' : np.float64, 'FG%.1' : np.float64, '3P.1' : np.float64,
             '3PA.1' : np.float64, '3P%.1' : np.float64, 'FT.1' : np.float64, 'FTA.1' : np.float64, 'FT%.1' : np.float64,
             'ORB.1' : np.float64, 'TRB.1' : np.float64, 'AST.1' : np.float64, 'STL.1' : np.float64, 'BLK.1' : np.float64,
-            'TOV.1' : np.float64, 'PF.1' : np.float64, "location" : str, "team" : str}
+            'TOV.1' : np.float64, 'PF.1' : np.float64, "location" : "category",
+            "team" : "category"}
     df = df.astype(dtypes)
 
-    # Disregard OT results, only whether Team won or lost. Convert W/L to bool
-    df["team_won"] = df["team_won"].apply(lambda x : str(x).split()[0])
-    df["team_won"] = df["team_won"].apply(lambda x : 1 if x == "W" else 0)
-
     # Map column names for opponent to be more intuitive
     col_map_dict = {'Opp' : "opponent", 'Tm' : "team_points",
                     'Opp.1' : "opponent_points", 'FG.1' : "opp_fg", 'FGA.1' : "opp_fga",
@@ -187,13 +277,12 @@ def scrape_team_game_logs_adv(team : str, season : int, verbose : bool=False,
     # Initialize gamelog
     url = f"http://www.sports-reference.com/cbb/schools/{parsed_team}/{season}-gamelogs-advanced.html"
 
-    # Scrape using requests
+    # Scrape using this thread's requests session
     try: 
-        r = requests.get(url, proxies=proxies, headers=headers)
+        r = _get_session().get(url, proxies=proxies, headers=headers, timeout=30)
         if r.status_code < 400:
-            # Parse response data using pandas after successful request
-            df = pd.read_html(r.content, parse_dates=True, attrs={'id': 'sgl-advanced'},
-                              header=1, index_col=1)[0]
+            # Parse gamelog table from response data after successful request
+            df = _parse_table(r.content, "sgl-advanced")
         else: 
             print(f"Failed request with status code {r.status_code}") 
             return None
@@ -206,7 +295,8 @@ def scrape_team_game_logs_adv(team : str, season : int, verbose : bool=False,
     df = df[df.index != "Date"].copy()
 
     # Explicitely make date index a datetime
-    df.index = pd.to_datetime(df.index, format="%Y-%m-%d")
+    df.index = pd.DatetimeIndex(np.asarray(df.index.values, dtype="datetime64[D]"),
+                                name=df.index.name)
 
     # Rename, drop junk columns
     df.drop(columns=["Unnamed: 17", "Unnamed: 22", "G"], inplace=True)
@@ -215,33 +305,34 @@ def scrape_team_game_logs_adv(team : str, season : int, verbose : bool=False,
 
     # Parse location to be H, A, or N for home, away, or neutral
     df["location"] = df["location"].fillna("H")
-    df["location"] = df["location"].apply(lambda x : "A" if x == "@" else x)
+    df["location"] = df["location"].where(df["location"] != "@", "A")
 
     # Set team, opponent names and drop NaNs (aka non-D1 teams)
     if normalize_names:
-        df["team"] = pd.Series([parsed_team for _ in range(len(df))], index=df.index)
-        df["Opp"] = df["Opp"].apply(parser.name_normalizer, **{"ignore_errors" : True})
+        df["team"] = parsed_team
+        # Normalize each unique opponent once rather than once per game
+        opp_names = {opp : parser.name_normalizer(opp, ignore_errors=True)
+                     for opp in df["Opp"].dropna().unique()}
+        df["Opp"] = df["Opp"].map(opp_names)
     else:
-        df["team"] = pd.Series([team for _ in range(len(df))], index=df.index)
+        df["team"] = team
     df.dropna(subset=["Opp"], axis=0, inplace=True)
 
-    # Change W/L column to be 0/1 indicator variable for if Team won
-    df["team_won"] = df["W/L"].copy()
-    df.drop(columns=["W/L"], axis=0, inplace=True)
+    # Change W/L column to be 0/1 indicator variable for if Team won. Disregard
+    # OT results, only whether Team won or lost, so only the W or L matters
+    df["team_won"] = (df["W/L"].astype(str).str[0] == "W").astype(np.int8)
+    df.drop(columns=["W/L"], inplace=True)
 
-    # Correct data type of the data frame
-    dtypes = {'Opp' : str, 'Tm' : np.float64, 'Opp.1' : np.float64, 'ORtg' : np.float64,
+    # Correct data type of the data frame, storing names and locations as
+    # categoricals since there are only a few unique values
+    dtypes = {'Opp' : "category", 'Tm' : np.float64, 'Opp.1' : np.float64, 'ORtg' : np.float64,
             'DRtg' : np.float64, 'Pace' : np.float64, 'FTr' : np.float64, '3PAr' : np.float64,
             'TS%' : np.float64, 'TRB%' : np.float64, 'AST%' : np.float64, 'STL%' : np.float64, 'BLK%' : np.float64,
             'eFG%' : np.float64, 'TOV%' : np.float64, 'ORB%' : np.float64, 'FT/FGA' : np.float64, 'eFG%.1' : np.float64,
-            'TOV%.1' : np.float64, 'DRB%' : np.float64, 'FT/FGA.1' : np.float64, "location" : str, "team" : str,
-            'team_won' : str}
+            'TOV%.1' : np.float64, 'DRB%' : np.float64, 'FT/FGA.1' : np.float64, "location" : "category",
+            "team" : "category"}
     df = df.astype(dtypes)
 
-    # Disregard OT results, only whether Team won or lost. Convert W/L to bool
-    df["team_won"] = df["team_won"].apply(lambda x : str(x).split()[0])
-    df["team_won"] = df["team_won"].apply(lambda x : 1 if x == "W" else 0)
-
     col_map_dict = {'Opp' : "opponent", 'Tm' : "team_points",
                     'Opp.1' : "opponent_points", 'eFG%.1' : "opponent_efg%",
                     'TOV%.1' : "opponent_tov%", 'FT/FGA.1' : "opponent_ft_per_fga"}
@@ -278,7 +369,8 @@ def scrape_team_game_logs(team : str, season : int, verbose : bool=False,
     Returns
     -------
     df : pd.DataFrame
-        dataframe containing all gamelogs for team in the specified season
+        dataframe containing all gamelogs for team in the specified season.
+        Returns None if either request fails
     """
 
     # Scrape basic gamelogs
@@ -290,12 +382,111 @@ def scrape_team_game_logs(team : str, season : int, verbose : bool=False,
                                        normalize_names=normalize_names,
                                        headers=headers, proxies=proxies)
 
-    # Join, discard duplicated columns
-    df = df_basic.join(df_adv, how="left", rsuffix="_dup")
+    # Can't join if either request failed
+    if df_basic is None or df_adv is None:
+        return None
 
-    drop_cols = [x for x in df if x.endswith('_dup')]
-    df.drop(drop_cols, axis=1, inplace=True)
+    # Discard advanced columns already in basic gamelogs, e.g. Opp, then join.
+    # Both tables normally have one row per game, so skip aligning if possible
+    df_adv = df_adv.drop(columns=df_adv.columns.intersection(df_basic.columns))
+    if df_basic.index.equals(df_adv.index):
+        df = pd.concat([df_basic, df_adv], axis=1)
+    else:
+        df = df_basic.join(df_adv, how="left")
 
     return df
 
 
+def scrape_season_game_logs(season : int, teams : list=None, max_workers : int=8,
+                            min_interval : float=3.0, verbose : bool=False,
+                            normalize_names : bool=True, headers : dict=None,
+                            proxies : dict=None) -> pd.DataFrame:
+    """
+    Scrape all gamelogs for the (season-1 - season) season, e.g. 2014-2015
+    season, from https://www.sports-reference.com/cbb/ for each team in teams.
+    Teams are scraped concurrently using a pool of threads since scraping is
+    dominated by waiting on requests, while starting at most one team's
+    scrape every min_interval seconds to avoid being rate limited.
+
+    Parameters
+    ----------
+    season : int
+        season year where season is the (season-1, season) season. For example,
+        if season = 2015, data is scraped for the 2014-2015 season.
+    teams : list (optional)
+        team names to scrape. Defaults to None, in which case all teams are
+        scraped. Teams that did not play D1 basketball in season, or whose
+        gamelogs fail to scrape or parse, are skipped.
+    max_workers : int (optional)
+        Maximum number of teams to scrape concurrently. Defaults to 8.
+    min_interval : float (optional)
+        Minimum number of seconds between starting to scrape each team.
+        Defaults to 3.
+    verbose : bool (optional)
+        Whether or not to output diagnostics. Defaults to False.
+    normalize_names : bool (optional)
+        Whether or not to normalize names. Defaults to True.
+    headers : dict (optional)
+        dictionary of headers for request
+    proxies : dict (optional)
+        dictionary of proxies for request
+
+    Returns
+    -------
+    df : pd.DataFrame
+        dataframe containing all gamelogs for all teams in the specified season.
+        Returns None if no gamelogs were scraped
+    """
+
+    # Validate season, team names up front rather than failing partway through
+    if season > 2024:
+        raise IOError("ERROR: Can't scrape data from the future!")
+    if season < 2011:
+        raise IOError("ERROR: Haven't validated scraping for seasons < 2010-2011!")
+
+    if teams is None:
+        teams = parser.get_all_teams()
+    for team in teams:
+        parser.name_normalizer(team, ignore_errors=False)
+
+    # Space out the start of each team's scrape across all threads
+    lock = threading.Lock()
+    next_start = [time.monotonic()]
+
+    def scrape(team):
+        with lock:
+            now = time.monotonic()
+            start = max(next_start[0], now)
+            next_start[0] = start + min_interval
+        time.sleep(start - now)
+
+        # Skip teams that fail, e.g. due to a different page layout, rather
+        # than losing all other teams' gamelogs
+        try:
+            return scrape_team_game_logs(team, season, verbose=verbose,
+                                         normalize_names=normalize_names,
+                                         headers=headers, proxies=proxies)
+        except Exception as error:
+            print(f"Failed to scrape {team}: {error!r}")
+            return None
+
+    # Scrape teams concurrently
+    team_dfs = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(scrape, team) : team for team in teams}
+        for future in as_completed(futures):
+            team_dfs[futures[future]] = future.result()
+
+    # Combine gamelogs in the order of teams, skipping failed requests
+    parts = [team_dfs[team] for team in teams if team_dfs[team] is not None]
+    if not parts:
+        return None
+
+    df = pd.concat(parts, axis=0)
+
+    # Restore categoricals, which become objects when categories differ by team
+    for col in ("team", "opponent", "location"):
+        df[col] = df[col].astype("category")
+
+    return df
+
@@ -9,29 +9,10 @@ over CBB seasons
 
 # Imports
 import numpy as np
-from itertools import zip_longest
 from datetime import datetime
 
 
-__all__ = ["median_unequal_arr", "start_reg_20102011", "end_reg_20102011",
-           "start_tourney_20102011", "end_tourney_20102011", "start_reg_20112012",
-           "end_reg_20112012", "start_tourney_20112012", "end_tourney_20112012",
-           "start_reg_20122013", "end_reg_20122013", "start_tourney_20122013",
-           "end_tourney_20122013", "start_reg_20132014", "end_reg_20132014",
-           "start_tourney_20132014", "end_tourney_20132014", "start_reg_20142015",
-           "end_reg_20142015",  "start_tourney_20142015", "end_tourney_20142015",
-           "start_reg_20152016", "end_reg_20152016",  "start_tourney_20152016",
-           "end_tourney_20152016", "start_reg_20162017", "end_reg_20162017",
-           "start_tourney_20162017",  "end_tourney_20162017", "start_reg_20172018",
-           "end_reg_20172018", "start_tourney_20172018",  "end_tourney_20172018",
-           "start_reg_20182019", "end_reg_20182019", "start_tourney_20182019",
-           "end_tourney_20182019", "start_reg_20192020", "end_reg_20192020",
-           "start_tourney_20192020", "end_tourney_20192020", "start_reg_20202021",
-           "end_reg_20202021", "start_tourney_20202021", "end_tourney_20202021",
-           "start_reg_20212022", "end_reg_20212022", "start_tourney_20212022",
-           "end_tourney_20212022", "start_reg_20222023", "end_reg_20222023", 
-           "start_tourney_20222023", "end_tourney_20222023", "start_reg_20232024", 
-           "end_reg_20232024", "start_tourney_20232024", "end_tourney_20232024"]
+__all__ = ["median_unequal_arr", "SEASON_DATES", "season_dates"]
 
 
 ################################################################################
@@ -40,114 +21,85 @@ __all__ = ["median_unequal_arr", "start_reg_20102011", "end_reg_20102011",
 #
 ################################################################################
 
-# 2010-2011
-start_reg_20102011 = datetime(2010, 11, 8)
-end_reg_20102011 = datetime(2011, 3, 13)
-start_tourney_20102011 = datetime(2011, 3, 15)
-end_tourney_20102011 = datetime(2011, 4, 4)
-
-# 2011-2012
-start_reg_20112012 = datetime(2011, 11, 7)
-end_reg_20112012 = datetime(2012, 3, 11)
-start_tourney_20112012 = datetime(2012, 3, 13)
-end_tourney_20112012 = datetime(2012, 4, 2)
-
-# 2012-2013
-start_reg_20122013 = datetime(2012, 11, 9)
-end_reg_20122013 = datetime(2013, 3, 17)
-start_tourney_20122013 = datetime(2013, 3, 19)
-end_tourney_20122013 = datetime(2013, 4, 8)
-
-# 2013-2014
-start_reg_20132014 = datetime(2013, 11, 8)
-end_reg_20132014 = datetime(2014, 3, 16)
-start_tourney_20132014 = datetime(2014, 3, 18)
-end_tourney_20132014 = datetime(2014, 4, 7)
-
-# 2014-2015
-start_reg_20142015 = datetime(2014, 11, 14)
-end_reg_20142015 = datetime(2015, 3, 15)
-start_tourney_20142015 = datetime(2015, 3, 17)
-end_tourney_20142015 = datetime(2015, 4, 6)
-
-# 2015-2016
-start_reg_20152016 = datetime(2015, 11, 13)
-end_reg_20152016 = datetime(2016, 3, 13)
-start_tourney_20152016 = datetime(2016, 3, 15)
-end_tourney_20152016 = datetime(2016, 4, 4)
-
-# 2016-2017
-start_reg_20162017 = datetime(2016, 11, 11)
-end_reg_20162017 = datetime(2017, 3, 12)
-start_tourney_20162017 = datetime(2017, 3, 14)
-end_tourney_20162017 = datetime(2017, 4, 3)
-
-# 2017-2018
-start_reg_20172018 = datetime(2017, 11, 10)
-end_reg_20172018 = datetime(2018, 3, 11)
-start_tourney_20172018 = datetime(2018, 3, 13)
-end_tourney_20172018 = datetime(2018, 4, 2)
-
-# 2018-2019
-start_reg_20182019 = datetime(2018, 11, 6)
-end_reg_20182019 = datetime(2019, 3, 17)
-start_tourney_20182019 = datetime(2019, 3, 19)
-end_tourney_20182019 = datetime(2019, 4, 8)
-
-# 2019-2020
-start_reg_20192020 = datetime(2019, 11, 5)
-end_reg_20192020 = datetime(2020, 3, 8)
-start_tourney_20192020 = datetime(2020, 3, 17)
-end_tourney_20192020 = datetime(2020, 4, 6)
-
-# 2020-2021
-start_reg_20202021 = datetime(2020, 11, 25)
-end_reg_20202021 = datetime(2021, 3, 14)
-start_tourney_20202021 = datetime(2021, 3, 18)
-end_tourney_20202021 = datetime(2021, 4, 5)
-
-# 2021-2022
-start_reg_20212022 = datetime(2021, 11, 9)
-end_reg_20212022 = datetime(2022, 3, 13)
-start_tourney_20212022 = datetime(2022, 3, 15)
-end_tourney_20212022 = datetime(2022, 4, 4)
-
-# 2022-2023
-start_reg_20222023 = datetime(2021, 11, 7)
-end_reg_20222023 = datetime(2022, 3, 12)
-start_tourney_20222023 = datetime(2022, 3, 14)
-end_tourney_20222023 = datetime(2022, 4, 3)
-
-# 2023-2024
-start_reg_20232024 = datetime(2021, 11, 6)
-end_reg_20232024 = datetime(2022, 3, 17)
-start_tourney_20232024 = None
-end_tourney_20232024 = None
-
-################################################################################
-#
-# Math utility functions
-#
-################################################################################
-
-
-def __median(x):
+# Season (ending year), regular season start, end, tournament start, end
+_RAW = [(2011, "2010-11-08", "2011-03-13", "2011-03-15", "2011-04-04"),
+        (2012, "2011-11-07", "2012-03-11", "2012-03-13", "2012-04-02"),
+        (2013, "2012-11-09", "2013-03-17", "2013-03-19", "2013-04-08"),
+        (2014, "2013-11-08", "2014-03-16", "2014-03-18", "2014-04-07"),
+        (2015, "2014-11-14", "2015-03-15", "2015-03-17", "2015-04-06"),
+        (2016, "2015-11-13", "2016-03-13", "2016-03-15", "2016-04-04"),
+        (2017, "2016-11-11", "2017-03-12", "2017-03-14", "2017-04-03"),
+        (2018, "2017-11-10", "2018-03-11", "2018-03-13", "2018-04-02"),
+        (2019, "2018-11-06", "2019-03-17", "2019-03-19", "2019-04-08"),
+        (2020, "2019-11-05", "2020-03-08", "2020-03-17", "2020-04-06"),
+        (2021, "2020-11-25", "2021-03-14", "2021-03-18", "2021-04-05"),
+        (2022, "2021-11-09", "2022-03-13", "2022-03-15", "2022-04-04"),
+        (2023, "2022-11-07", "2023-03-12", "2023-03-14", "2023-04-03"),
+        (2024, "2023-11-06", "2024-03-17", "2024-03-19", "2024-04-08")]
+
+# Structured array of key dates, one row per season. Unknown dates are NaT
+SEASON_DATES = np.array(_RAW, dtype=[("season", "i4"), ("reg_start", "datetime64[D]"),
+                                     ("reg_end", "datetime64[D]"),
+                                     ("tourney_start", "datetime64[D]"),
+                                     ("tourney_end", "datetime64[D]")])
+
+# Map legacy names, e.g. start_reg_20102011, to SEASON_DATES fields
+_LEGACY_FIELDS = {"start_reg" : "reg_start", "end_reg" : "reg_end",
+                  "start_tourney" : "tourney_start", "end_tourney" : "tourney_end"}
+__all__ += [f"{prefix}_{season-1}{season}" for season in SEASON_DATES["season"]
+            for prefix in _LEGACY_FIELDS]
+
+
+def season_dates(season : int) -> np.void:
     """
-    Compute the simple median of an array
+    Get the key dates for the (season-1, season) season, e.g. season = 2015
+    for the 2014-2015 season
 
     Parameters
     ----------
-    x : iterable
-        array
+    season : int
+        season year
 
     Returns
     -------
-    avg : float
-        average
+    dates : numpy.void
+        SEASON_DATES record with fields season, reg_start, reg_end,
+        tourney_start, tourney_end
     """
-    x = [i for i in x if i is not None]
-    return np.nanmedian(x)
-# end function
+
+    ind = season - SEASON_DATES["season"][0]
+    if ind < 0 or ind >= len(SEASON_DATES):
+        raise KeyError(f"No dates for the {season-1}-{season} season")
+
+    return SEASON_DATES[ind]
+
+
+def __getattr__(name : str):
+    """
+    Provide the legacy per-season constants, e.g. start_reg_20102011, as
+    datetimes, or None if the date is unknown
+    """
+
+    prefix, _, years = name.rpartition("_")
+    if (prefix in _LEGACY_FIELDS and len(years) == 8 and years.isdigit()
+        and years[:4] == str(int(years[4:]) - 1)):
+        try:
+            date = season_dates(int(years[4:]))[_LEGACY_FIELDS[prefix]]
+        except KeyError:
+            pass
+        else:
+            if np.isnat(date):
+                return None
+            return datetime.combine(date.item(), datetime.min.time())
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+################################################################################
+#
+# Math utility functions
+#
+################################################################################
 
 
 def median_unequal_arr(x):
@@ -167,4 +119,10 @@ def median_unequal_arr(x):
         iterable in x
     """
 
-    return list(map(__median, zip_longest(*x)))
\ No newline at end of file
+    # Pad rows with NaNs to the length of the longest row
+    lengths = [len(row) for row in x]
+    arr = np.full((len(x), max(lengths, default=0)), np.nan)
+    for ii, row in enumerate(x):
+        arr[ii, :lengths[ii]] = row
+
+    return list(np.nanmedian(arr, axis=0))
\ No newline at end of file